@@ -1,22 +1,74 @@
 # main.py - GERÇEK VERİLİ API
 from fastapi import FastAPI, HTTPException, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import re
+import asyncio
+import threading
+from collections import namedtuple
 import json
 from typing import List, Optional
 import io
 import os
 
+# Opsiyonel: büyük su kaynağı tabloları için KD-tree hızlandırması
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Opsiyonel: büyük JSON yükleri için hızlı (Rust/SIMD) ayrıştırıcı
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opsiyonel: Overpass yanıtını belleğe açmadan akış halinde ayrıştırma
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Opsiyonel: GIL'siz çok çekirdekli tarama için Numba JIT
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _nearest_water_kernel(sin_wlat, cos_wlat, wlon_rad,
+                              coord_lat_rad, coord_lon_rad, out_idx, out_cos):
+        # (M, N) ara matrisi hiç ayırmadan koordinat başına max cos(sigma)
+        for i in numba.prange(coord_lat_rad.shape[0]):
+            sin_lat = np.sin(coord_lat_rad[i])
+            cos_lat = np.cos(coord_lat_rad[i])
+            best = -2.0
+            best_j = 0
+            for j in range(sin_wlat.shape[0]):
+                c = (sin_lat * sin_wlat[j]
+                     + cos_lat * cos_wlat[j] * np.cos(wlon_rad[j] - coord_lon_rad[i]))
+                if c > best:
+                    best = c
+                    best_j = j
+            out_idx[i] = best_j
+            out_cos[i] = best
+else:
+    _nearest_water_kernel = None
+
 app = FastAPI(
     title="Turkey Agricultural Land API",
     description="Agricultural land suitability analysis for Turkey",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson kuruluysa tüm endpoint'ler SIMD hızında serialize edilir
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # CORS
@@ -66,53 +118,154 @@ class ComprehensiveResponse(BaseModel):
 
 
 # 🌊 GERÇEK SU KAYNAKLARI FONKSİYONLARI
+# SoA (structure-of-arrays) su kaynağı deposu: lat/lon float64 ndarray,
+# name/type object ndarray - vektörel mesafe hesabı için. Radyan ve
+# sin/cos dizileri bir kez yükleme anında hesaplanır, böylece sıcak
+# döngü saf çarpma-toplama olur.
+WaterSources = namedtuple('WaterSources',
+                          ['lats', 'lons', 'names', 'types',
+                           'lons_rad', 'sin_lats', 'cos_lats', 'tree'])
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def make_water_sources(lats, lons, names, types):
+    """Bundle water SoA arrays with precomputed trig for great-circle distance"""
+    lats_arr = np.ascontiguousarray(lats, dtype=np.float64)
+    lons_arr = np.ascontiguousarray(lons, dtype=np.float64)
+    lats_rad = np.deg2rad(lats_arr)
+
+    # Büyük tablolar için uzamsal indeks bir kez burada kurulur; sorgu başına
+    # O(N) tarama yerine O(log N) KD-tree araması yapılır
+    tree = None
+    if cKDTree is not None and lats_arr.size > _KDTREE_THRESHOLD:
+        tree = cKDTree(np.column_stack([lats_arr, lons_arr]))
+
+    return WaterSources(
+        lats=lats_arr,
+        lons=lons_arr,
+        names=np.asarray(names, dtype=object),
+        types=np.asarray(types, dtype=object),
+        lons_rad=np.deg2rad(lons_arr),
+        sin_lats=np.sin(lats_rad),
+        cos_lats=np.cos(lats_rad),
+        tree=tree
+    )
+
+
+def build_water_soa(water_list):
+    """Convert list of water source dicts to SoA arrays"""
+    return make_water_sources(
+        [w['lat'] for w in water_list],
+        [w['lon'] for w in water_list],
+        [w['name'] for w in water_list],
+        [w['type'] for w in water_list]
+    )
+
+
+def save_water_cache(cache_file, water):
+    """Persist water SoA arrays as NPZ (milliseconds to reload vs seconds of JSON parse)"""
+    try:
+        np.savez(cache_file.replace('.npz', ''),
+                 lat=water.lats, lon=water.lons, name=water.names, type=water.types)
+    except:
+        pass
+
+
+# Ana instance 429/504 dönerse sırayla denenecek Overpass instance'ları
+OVERPASS_ENDPOINTS = [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.openstreetmap.ru/api/interpreter",
+]
+
+
 def get_all_water_sources_from_osm():
     """Get all water sources in Turkey from OpenStreetMap"""
     print("🌊 Fetching water sources from OpenStreetMap...")
 
-    # Önceden cache'lenmiş su kaynaklarını kontrol et
-    cache_file = "turkiye_water_sources_cache.json"
+    # Önceden cache'lenmiş su kaynaklarını kontrol et (SoA dizileri NPZ olarak)
+    cache_file = "turkiye_water_sources_cache.npz"
     if os.path.exists(cache_file):
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                print(f"✅ {len(cached_data)} water sources loaded from cache!")
-                return cached_data
+            z = np.load(cache_file, allow_pickle=True)
+            water = make_water_sources(z['lat'], z['lon'], z['name'], z['type'])
+            print(f"✅ {water.lats.size} water sources loaded from cache!")
+            return water
+        except:
+            pass
+
+    # Eski JSON cache varsa bir defalık NPZ'ye taşı
+    legacy_cache = "turkiye_water_sources_cache.json"
+    if os.path.exists(legacy_cache):
+        try:
+            if orjson is not None:
+                with open(legacy_cache, 'rb') as f:
+                    cached_data = orjson.loads(f.read())
+            else:
+                with open(legacy_cache, 'r', encoding='utf-8') as f:
+                    cached_data = json.load(f)
+            water = build_water_soa(cached_data)
+            save_water_cache(cache_file, water)
+            print(f"✅ {water.lats.size} water sources migrated from legacy JSON cache!")
+            return water
         except:
             pass
 
     # Turkey bbox
     turkey_bbox = "26.0,36.0,45.0,42.0"
 
-    # Query for all water sources
+    # Query for all water sources (nwr kısaltması node/way/relation'ı tek
+    # filtrede toplar, sunucu tarafı işi azaltır)
     water_query = f"""
     [out:json][timeout:180];
     (
-      way["waterway"="river"]({turkey_bbox});
-      way["waterway"="stream"]({turkey_bbox});
-      relation["waterway"="river"]({turkey_bbox});
-      way["natural"="water"]({turkey_bbox});
-      way["water"="lake"]({turkey_bbox});
-      way["water"="reservoir"]({turkey_bbox});
-      relation["natural"="water"]({turkey_bbox});
-      way["waterway"="dam"]({turkey_bbox});
+      nwr["waterway"~"^(river|stream|dam)$"]({turkey_bbox});
+      nwr["natural"="water"]({turkey_bbox});
+      nwr["water"~"^(lake|reservoir)$"]({turkey_bbox});
     );
     out center;
     """
 
-    try:
-        response = requests.post(
-            "https://overpass-api.de/api/interpreter",
-            data=water_query,
-            headers={'Content-Type': 'application/x-www-form-urlencoded'},
-            timeout=300
-        )
+    headers = {
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Accept-Encoding': 'gzip'  # Overpass destekliyor, transfer ~10x küçülür
+    }
 
-        if response.status_code == 200:
-            data = response.json()
-            water_sources = []
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        max_retries=Retry(total=2, backoff_factor=1, status_forcelist=[429, 502, 503, 504])
+    ))
 
-            for element in data['elements']:
+    try:
+        # Ana instance yanıt vermezse alternatif Overpass instance'larına geç
+        response = None
+        for endpoint in OVERPASS_ENDPOINTS:
+            try:
+                response = session.post(endpoint, data=water_query, headers=headers,
+                                        timeout=300, stream=(ijson is not None))
+                if response.status_code == 200:
+                    break
+                print(f"❌ OSM error: {response.status_code} ({endpoint})")
+            except requests.RequestException as e:
+                print(f"❌ OSM connection error: {e} ({endpoint})")
+                response = None
+
+        if response is not None and response.status_code == 200:
+            if ijson is not None:
+                # Elemanları tek tek akıtarak ayrıştır: tüm payload'ı aynı anda
+                # Python dict'lerine açmadan tepe bellek yarıya iner
+                response.raw.decode_content = True
+                elements = ijson.items(response.raw, 'elements.item')
+            elif orjson is not None:
+                elements = orjson.loads(response.content)['elements']
+            else:
+                elements = response.json()['elements']
+
+            # Ara dict listesi kurmadan doğrudan SoA kolon listelerine topla
+            lats, lons, names, types = [], [], [], []
+
+            for element in elements:
                 if 'center' in element:
                     lat = element['center']['lat']
                     lon = element['center']['lon']
@@ -137,48 +290,141 @@ def get_all_water_sources_from_osm():
                             water_type = "reservoir"
 
                     if water_type:
-                        water_sources.append({
-                            'lat': lat,
-                            'lon': lon,
-                            'name': name,
-                            'type': water_type,
-                            'source': 'OpenStreetMap'
-                        })
+                        lats.append(lat)
+                        lons.append(lon)
+                        names.append(name)
+                        types.append(water_type)
+
+            water = make_water_sources(lats, lons, names, types)
 
             # Cache'e kaydet
-            try:
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(water_sources, f, ensure_ascii=False, indent=2)
-            except:
-                pass
+            save_water_cache(cache_file, water)
 
-            print(f"✅ {len(water_sources)} water sources found!")
-            return water_sources
+            print(f"✅ {water.lats.size} water sources found!")
+            return water
         else:
-            print(f"❌ OSM error: {response.status_code}")
-            return []
+            print("❌ All Overpass instances failed")
+            return build_water_soa([])
 
     except Exception as e:
         print(f"❌ OSM connection error: {e}")
-        return []
+        return build_water_soa([])
+
+
+# Süreç içi TTL cache: tekrarlanan isteklerde disk/Overpass yoluna hiç inilmez
+_WATER_CACHE = None
+_WATER_CACHE_TS = 0.0
+_WATER_CACHE_TTL = 86400  # saniye
+
+
+def get_water_sources_cached():
+    """Return the water table from the in-process cache, refreshing once per TTL"""
+    global _WATER_CACHE, _WATER_CACHE_TS
+
+    if _WATER_CACHE is not None and time.time() - _WATER_CACHE_TS < _WATER_CACHE_TTL:
+        return _WATER_CACHE
+
+    water = get_all_water_sources_from_osm()
+    if water.lats.size > 0:
+        _WATER_CACHE = water
+        _WATER_CACHE_TS = time.time()
+    return water
 
 
 def calculate_distance_to_nearest_water(lat, lon, water_sources):
-    """Calculate distance to nearest water source"""
-    min_distance = float('inf')
-    nearest_water = {"name": "unknown", "type": "unknown", "distance_km": 0}
-
-    for water in water_sources:
-        distance_km = np.sqrt((lat - water['lat']) ** 2 + (lon - water['lon']) ** 2) * 111
-        if distance_km < min_distance:
-            min_distance = distance_km
-            nearest_water = {
-                "name": water['name'],
-                "type": water['type'],
-                "distance_km": distance_km
-            }
+    """Calculate distance to nearest water source (vectorized over SoA arrays)"""
+    if water_sources.lats.size == 0:
+        return {"name": "unknown", "type": "unknown", "distance_km": 0}
+
+    # Uzamsal indeks kuruluysa tam taramaya hiç girme
+    if water_sources.tree is not None:
+        _, i = water_sources.tree.query([lat, lon], k=1)
+        i = int(i)
+        return {
+            "name": water_sources.names[i],
+            "type": water_sources.types[i],
+            "distance_km": float(haversine_km(lat, lon,
+                                              water_sources.lats[i], water_sources.lons[i]))
+        }
+
+    # Küresel kosinüs teoremi: cos(sigma) en büyük olan nokta en yakındır,
+    # arccos sadece kazanana uygulanır
+    lat_r = math.radians(lat)
+    dlon = water_sources.lons_rad - math.radians(lon)
+    cos_sigma = (math.sin(lat_r) * water_sources.sin_lats
+                 + math.cos(lat_r) * water_sources.cos_lats * np.cos(dlon))
+    i = int(cos_sigma.argmax())
 
-    return nearest_water
+    return {
+        "name": water_sources.names[i],
+        "type": water_sources.types[i],
+        "distance_km": math.acos(min(1.0, max(-1.0, cos_sigma[i]))) * EARTH_RADIUS_KM
+    }
+
+
+# Toplu çekilişler için tek üreteç: çağrı başına NumPy dispatch maliyeti yok
+_rng = np.random.default_rng()
+
+# (M, N) yayın matrisini L2 cache içinde tutmak için M yönünde blok boyu
+_BATCH_BLOCK = 512
+# Bu eşiğin üzerinde su kaynağı varsa O(log N) KD-tree sorgusuna geç
+_KDTREE_THRESHOLD = 50000
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in km between coordinate arrays"""
+    lat1_r = np.deg2rad(np.asarray(lat1, dtype=np.float64))
+    lat2_r = np.deg2rad(np.asarray(lat2, dtype=np.float64))
+    dlat = lat2_r - lat1_r
+    dlon = np.deg2rad(np.asarray(lon2, dtype=np.float64)) - np.deg2rad(np.asarray(lon1, dtype=np.float64))
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_r) * np.cos(lat2_r) * np.sin(dlon / 2) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_water_batch(coords, water_sources):
+    """Find nearest water source for all coordinates in one vectorized pass"""
+    coords = np.asarray(coords, dtype=np.float64)
+    m = coords.shape[0]
+
+    if m == 0 or water_sources.lats.size == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0)
+
+    if water_sources.tree is not None:
+        _, idx = water_sources.tree.query(coords, k=1)
+        # Derece uzayındaki adaylar için gerçek büyük daire mesafesi
+        dist_km = haversine_km(coords[:, 0], coords[:, 1],
+                               water_sources.lats[idx], water_sources.lons[idx])
+        return idx, dist_km
+
+    # scipy yoksa ama Numba varsa: matris ayırmadan paralel JIT çekirdeği
+    if _nearest_water_kernel is not None and water_sources.lats.size > _KDTREE_THRESHOLD:
+        out_idx = np.zeros(m, dtype=np.int64)
+        out_cos = np.zeros(m, dtype=np.float64)
+        _nearest_water_kernel(
+            water_sources.sin_lats, water_sources.cos_lats, water_sources.lons_rad,
+            np.deg2rad(np.ascontiguousarray(coords[:, 0])),
+            np.deg2rad(np.ascontiguousarray(coords[:, 1])),
+            out_idx, out_cos
+        )
+        return out_idx, np.arccos(np.clip(out_cos, -1.0, 1.0)) * EARTH_RADIUS_KM
+
+    idx = np.zeros(m, dtype=np.intp)
+    max_cos = np.full(m, -2.0)
+
+    # Tüm M x N matrisini tek seferde ayırmak yerine bloklar halinde;
+    # cos(sigma) en büyük olan nokta en yakın olandır
+    for start in range(0, m, _BATCH_BLOCK):
+        block = coords[start:start + _BATCH_BLOCK]
+        lat_r = np.deg2rad(block[:, 0:1])
+        lon_r = np.deg2rad(block[:, 1:2])
+        cos_sigma = (np.sin(lat_r) * water_sources.sin_lats[None, :]
+                     + np.cos(lat_r) * water_sources.cos_lats[None, :]
+                     * np.cos(water_sources.lons_rad[None, :] - lon_r))
+        block_idx = cos_sigma.argmax(axis=1)
+        idx[start:start + _BATCH_BLOCK] = block_idx
+        max_cos[start:start + _BATCH_BLOCK] = cos_sigma[np.arange(block.shape[0]), block_idx]
+
+    return idx, np.arccos(np.clip(max_cos, -1.0, 1.0)) * EARTH_RADIUS_KM
 
 
 def get_climate_data(lat, lon):
@@ -245,6 +491,12 @@ def estimate_soil_quality(lat, lon, elevation):
         }
 
 
+# Tarım arazisi sayılan landcover anahtar kelimeleri - satır başına Python
+# substring taraması yerine tek derlenmiş regex
+_LC_PATTERN = 'farm|agricultural|orchard|vineyard'
+_LC_RE = re.compile(_LC_PATTERN)
+
+
 def calculate_comprehensive_suitability(row):
     """Calculate comprehensive productivity score"""
     score = 0
@@ -311,7 +563,7 @@ def calculate_comprehensive_suitability(row):
 
     # LANDCOVER BONUS
     lc_type = str(row.get('landcover_type', '')).lower()
-    if any(keyword in lc_type for keyword in ['farm', 'agricultural', 'orchard', 'vineyard']):
+    if _LC_RE.search(lc_type):
         score += 8
         reasons.append("existing agricultural land")
         details.append(f"🏞 Landcover: {lc_type} - BONUS")
@@ -342,10 +594,15 @@ def quick_slope_estimate(elevation, lat, lon):
         return np.random.uniform(8, 20)
 
 
+# Kaba şehir merkezleri (Ankara, İstanbul, İzmir, Adana) - her çağrıda
+# liste kurmamak için modül seviyesinde diziler
+_CITY_LATS = np.array([39.9, 41.0, 38.4, 36.9])
+_CITY_LONS = np.array([32.8, 28.9, 27.1, 35.3])
+
+
 def calculate_realistic_urban_distance(lat, lon):
-    cities = [(39.9, 32.8), (41.0, 28.9), (38.4, 27.1), (36.9, 35.3)]
-    min_dist = min([np.sqrt((lat - c[0]) ** 2 + (lon - c[1]) ** 2) * 111 for c in cities])
-    return min_dist * 1000 * np.random.uniform(0.8, 1.2)
+    min_dist = np.hypot(lat - _CITY_LATS, lon - _CITY_LONS).min() * 111
+    return min_dist * 1000 * _rng.uniform(0.8, 1.2)
 
 
 def categorize_suitability(score):
@@ -359,7 +616,7 @@ def categorize_suitability(score):
         return "LOW PRODUCTIVITY"
 
 
-def analyze_coordinate_with_real_water(coord_data, water_sources):
+def analyze_coordinate_with_real_water(coord_data, water_sources, nearest_water=None):
     """Coordinate analysis with real water sources"""
     lat, lon, original_data = coord_data
 
@@ -370,8 +627,9 @@ def analyze_coordinate_with_real_water(coord_data, water_sources):
     elevation = quick_elevation_estimate(lat, lon)
     slope = quick_slope_estimate(elevation, lat, lon)
 
-    # Real water distance
-    nearest_water = calculate_distance_to_nearest_water(lat, lon, water_sources)
+    # Real water distance (batch önceden hesaplandıysa tekrar taramaya gerek yok)
+    if nearest_water is None:
+        nearest_water = calculate_distance_to_nearest_water(lat, lon, water_sources)
 
     # Urban distance
     urban_dist_km = calculate_realistic_urban_distance(lat, lon) / 1000
@@ -411,6 +669,168 @@ def analyze_coordinate_with_real_water(coord_data, water_sources):
     return enhanced_row
 
 
+def analyze_coordinates_batch(coordinates, water_sources, max_areas=100):
+    """Vectorized analysis of all coordinates in one pandas pipeline"""
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    df = pd.DataFrame(coords, columns=['latitude', 'longitude'])
+
+    # Türkiye sınır filtresi (skaler versiyonla aynı koşul)
+    lat = df['latitude'].to_numpy()
+    lon = df['longitude'].to_numpy()
+    keep = ((lat >= 36.0) & (lat <= 42.0)) | ~((lon >= 26.0) & (lon <= 45.0))
+    df = df[keep].reset_index(drop=True)
+
+    m = len(df)
+    if m == 0:
+        return df
+
+    lat = df['latitude'].to_numpy()
+    lon = df['longitude'].to_numpy()
+
+    # Yükseklik: enlem bandını np.digitize ile bul, band başına ayrı ayrı
+    # çekmek yerine alt/üst sınır dizileriyle tek uniform çekilişi yap
+    lat_band = np.digitize(lat, [37.0, 39.0, 41.0])
+    elevation = _rng.uniform(np.array([50.0, 800.0, 200.0, 1000.0])[lat_band],
+                             np.array([300.0, 1200.0, 800.0, 1800.0])[lat_band])
+
+    # Eğim ve toprak aynı yükseklik bantlarını kullanır
+    elev_band = np.digitize(elevation, [200.0, 500.0, 1000.0])
+    slope = _rng.uniform(np.array([1.0, 2.0, 5.0, 8.0])[elev_band],
+                         np.array([3.0, 6.0, 10.0, 20.0])[elev_band])
+
+    # En yakın su kaynağı - tek toplu yayın
+    water_idx, water_dist_km = nearest_water_batch(df[['latitude', 'longitude']].to_numpy(), water_sources)
+
+    # Şehir mesafesi: 4 şehre olan minimum mesafe, tek vektörel ifade
+    city_d = np.hypot(lat[:, None] - _CITY_LATS, lon[:, None] - _CITY_LONS).min(axis=1) * 111
+    urban_dist_km = city_d * _rng.uniform(0.8, 1.2, m)
+
+    # İklim ve toprak: band kodu üzerinden tablo okuması (gather), dallanma yok
+    precipitation = np.array([650, 380, 850, 450], dtype=np.int16)[lat_band]
+    sunshine = np.array([2950, 2650, 1950, 2450], dtype=np.int16)[lat_band]
+    climate_type = np.array(['Mediterranean', 'Continental', 'Black Sea',
+                             'Severe Continental'], dtype=object)[lat_band]
+
+    soil_type = np.array(['Loamy', 'Clay-Loamy', 'Loamy-Sandy', 'Stony-Sandy'],
+                         dtype=object)[elev_band]
+    # float64 kalmalı: float32(6.8) f-string'de 6.8000001907... diye yazılır
+    soil_ph = np.array([6.8, 7.1, 6.5, 5.8])[elev_band]
+    soil_productivity = np.array(['high', 'medium-high', 'medium', 'low'],
+                                 dtype=object)[elev_band]
+
+    # Kompakt sayısal dtypes: skor aritmetiği küçük bitişik kolonlar üzerinde döner
+    df['elevation_m'] = np.round(elevation).astype(np.int16)
+    df['slope_percent'] = np.round(slope, 1).astype(np.float32)
+    df['water_distance_km'] = np.round(water_dist_km, 1).astype(np.float32)
+    df['nearest_water_name'] = water_sources.names[water_idx]
+    df['nearest_water_type'] = water_sources.types[water_idx]
+    df['urban_distance_km'] = np.round(urban_dist_km, 1).astype(np.float32)
+    df['soil_type'] = soil_type
+    df['soil_ph'] = soil_ph
+    df['soil_productivity'] = soil_productivity
+    df['annual_precipitation_mm'] = precipitation
+    df['sunshine_hours'] = sunshine
+    df['climate_type'] = climate_type
+    df['landcover_type'] = 'agriculture'
+    df['region_name'] = ''
+    df['data_source'] = 'OSM'
+
+    # Skorlama: tetiklenen kriterler satır başına tek uint16 bitmask'te
+    # toplanır; skor, bitlerin puan tablosuyla çarpımından çıkar. String
+    # listeleri burada hiç kurulmaz - mask sadece gösterilen satırlar için
+    # etikete çözülür
+    water_km = df['water_distance_km'].to_numpy()
+    slope_r = df['slope_percent'].to_numpy()
+    elev_r = df['elevation_m'].to_numpy()
+    lc_bonus = df['landcover_type'].str.lower().str.contains(
+        _LC_PATTERN, regex=True, na=False).to_numpy()
+
+    mask = np.zeros(m, dtype=np.uint16)
+    mask |= (water_km <= 5).astype(np.uint16) << 0
+    mask |= ((water_km > 5) & (water_km <= 10)).astype(np.uint16) << 1
+    mask |= (slope_r <= 5).astype(np.uint16) << 2
+    mask |= ((slope_r > 5) & (slope_r <= 10)).astype(np.uint16) << 3
+    mask |= (elev_r <= 800).astype(np.uint16) << 4
+    mask |= ((elev_r > 800) & (elev_r <= 1500)).astype(np.uint16) << 5
+    mask |= (elev_band == 0).astype(np.uint16) << 6  # 'high' toprak verimi
+    mask |= (elev_band == 1).astype(np.uint16) << 7  # 'medium-high'
+    mask |= ((precipitation >= 400) & (precipitation <= 800)).astype(np.uint16) << 8
+    mask |= ((sunshine >= 1800) & (sunshine <= 2800)).astype(np.uint16) << 9
+    mask |= lc_bonus.astype(np.uint16) << 10
+
+    bits = (mask[:, None] >> np.arange(len(_REASON_LABELS))) & 1
+    score = (bits * _REASON_SCORES).sum(axis=1)
+
+    df['reason_mask'] = mask
+    df['suitability_score'] = score.astype(np.int16)
+    df['suitability_category'] = np.select(
+        [score >= 80, score >= 70, score >= 60],
+        ['HIGHLY PRODUCTIVE', 'PRODUCTIVE', 'MODERATELY PRODUCTIVE'],
+        default='LOW PRODUCTIVITY'
+    )
+
+    # Verimli alanları filtrele, en iyi max_areas tanesini al. Açıklama
+    # metinleri burada üretilmez; sadece gösterilecek satırlar için
+    # add_suitability_details ile sonradan doldurulur
+    return df[df['suitability_score'] >= 60].nlargest(max_areas, 'suitability_score').copy()
+
+
+# Bit sırası reason_mask ile birebir; skor ağırlıkları aynı tablodan okunur
+_REASON_LABELS = ('very close to water', 'close to water', 'low slope', 'medium slope',
+                  'low elevation', 'medium elevation', 'fertile soil', 'good soil',
+                  'ideal precipitation', 'ideal sunshine', 'existing agricultural land')
+_REASON_SCORES = np.array([25, 18, 20, 15, 15, 10, 10, 7, 8, 7, 8], dtype=np.int16)
+
+
+def _format_row_details(row):
+    """Decode a reason bitmask into the human-readable detail string"""
+    mask = int(row['reason_mask'])
+    details = []
+
+    if mask & (1 << 0):
+        details.append(f"💧 Water: {row['water_distance_km']:.1f}km ({row['nearest_water_name']}) - EXCELLENT")
+    elif mask & (1 << 1):
+        details.append(f"💧 Water: {row['water_distance_km']:.1f}km ({row['nearest_water_name']}) - GOOD")
+
+    if mask & (1 << 2):
+        details.append(f"📐 Slope: {row['slope_percent']:.1f}% - EXCELLENT")
+    elif mask & (1 << 3):
+        details.append(f"📐 Slope: {row['slope_percent']:.1f}% - GOOD")
+
+    if mask & (1 << 4):
+        details.append(f"⛰ Elevation: {row['elevation_m']}m - EXCELLENT")
+    elif mask & (1 << 5):
+        details.append(f"⛰ Elevation: {row['elevation_m']}m - GOOD")
+
+    if mask & (1 << 6):
+        details.append(f"🌱 Soil: {row['soil_type']} (pH:{row['soil_ph']}) - EXCELLENT")
+    elif mask & (1 << 7):
+        details.append(f"🌱 Soil: {row['soil_type']} (pH:{row['soil_ph']}) - GOOD")
+
+    if mask & (1 << 8):
+        details.append(f"🌧 Precipitation: {row['annual_precipitation_mm']}mm - EXCELLENT")
+
+    if mask & (1 << 9):
+        details.append(f"☀ Sunshine: {row['sunshine_hours']} hours - EXCELLENT")
+
+    if mask & (1 << 10):
+        details.append(f"🏞 Landcover: {str(row['landcover_type']).lower()} - BONUS")
+
+    return " | ".join(details)
+
+
+def add_suitability_details(df):
+    """Fill reason/detail strings for the (few) rows that will be displayed"""
+    df = df.copy()
+    if len(df) > 0:
+        df['suitability_reasons'] = [
+            ", ".join(label for b, label in enumerate(_REASON_LABELS) if m >> b & 1)
+            for m in df['reason_mask'].astype(int)
+        ]
+        df['detailed_reasons'] = df.apply(_format_row_details, axis=1)
+    return df
+
+
 # 🌟 RENKLİ ÇIKTI OLUŞTURMA
 def create_visual_output(analysis_result):
     output = "🌾 COMPREHENSIVE AGRICULTURAL PRODUCTIVITY ANALYSIS\n"
@@ -449,36 +869,66 @@ def load_coordinates_from_csv():
         "AKILLI_tarimsal_analiz.csv"
     ]
 
-    all_coordinates = []
+    coordinate_arrays = []
 
     for csv_file in csv_files:
         if os.path.exists(csv_file):
             try:
-                df = pd.read_csv(csv_file, encoding='utf-8')
+                # Sadece koordinat kolonlarını oku, iterrows yerine tek .to_numpy()
+                df = pd.read_csv(
+                    csv_file, encoding='utf-8',
+                    usecols=lambda c: c in {'lat', 'lon', 'latitude', 'longitude'}
+                )
+                df = df.rename(columns={'latitude': 'lat', 'longitude': 'lon'})
                 print(f"✅ {len(df)} coordinates loaded from {csv_file}")
 
-                # Farklı kolon isimlerini kontrol et
                 if 'lat' in df.columns and 'lon' in df.columns:
-                    for _, row in df.iterrows():
-                        all_coordinates.append([row['lat'], row['lon']])
-                elif 'latitude' in df.columns and 'longitude' in df.columns:
-                    for _, row in df.iterrows():
-                        all_coordinates.append([row['latitude'], row['longitude']])
+                    coordinate_arrays.append(df[['lat', 'lon']].to_numpy(dtype=np.float64))
 
             except Exception as e:
                 print(f"❌ Error reading {csv_file}: {e}")
 
     # Eğer CSV'den koordinat bulunamazsa, örnek koordinatlar kullan
-    if not all_coordinates:
+    if not coordinate_arrays:
         print("⚠️ No CSV files found, using sample coordinates")
-        all_coordinates = [
+        return np.array([
             [39.9334, 32.8597], [41.0082, 28.9784], [38.4237, 27.1428],
             [36.9864, 35.3253], [40.1885, 29.0610], [37.9144, 40.2306],
             [41.2867, 36.3300], [36.8000, 34.6333], [39.0571, 36.1713],
             [40.7214, 41.8005], [40.7522, 41.8280]
-        ]
+        ], dtype=np.float64)
+
+    return np.concatenate(coordinate_arrays, axis=0)
+
+
+# Koordinatlar da bir kez okunur; CSV'ler istek yolunda tekrar parse edilmez
+_COORDS_CACHE = None
+
+
+def get_coordinates_cached():
+    global _COORDS_CACHE
+    if _COORDS_CACHE is None:
+        _COORDS_CACHE = load_coordinates_from_csv()
+    return _COORDS_CACHE
+
+
+# 🔥 BAŞLANGIÇTA CACHE ISINDIRMA
+# İlk istek Overpass/CSV maliyetini ödemesin diye yükleme startup'ta arka
+# plan thread'ine alınır; endpoint'ler event üzerinden ısınmayı bekler
+_warmup_done = threading.Event()
 
-    return all_coordinates
+
+def _warm_caches():
+    try:
+        get_water_sources_cached()
+        get_coordinates_cached()
+    finally:
+        _warmup_done.set()
+
+
+@app.on_event("startup")
+async def warmup():
+    asyncio.get_event_loop().run_in_executor(None, _warm_caches)
 
 
 # 🚀 GERÇEK VERİLİ ANALİZ ENDPOINT'İ
@@ -488,16 +938,19 @@ async def comprehensive_real_analysis(max_areas: int = 100, sample_size: int = 5
     try:
         start_time = time.time()
 
+        # Startup ısınması sürüyorsa bitmesini bekle (çifte Overpass çağrısı olmasın)
+        await asyncio.to_thread(_warmup_done.wait)
+
         print("🌊 Fetching real water sources...")
-        water_sources = get_all_water_sources_from_osm()
-        if not water_sources:
+        water_sources = get_water_sources_cached()
+        if water_sources.lats.size == 0:
             return {
                 "success": False,
                 "message": "Water sources could not be retrieved"
             }
 
         print("📊 Loading coordinates from CSV files...")
-        coordinates = load_coordinates_from_csv()
+        coordinates = get_coordinates_cached()
 
         # Örnekleme
         if len(coordinates) > sample_size:
@@ -505,53 +958,47 @@ async def comprehensive_real_analysis(max_areas: int = 100, sample_size: int = 5
 
         print(f"🔍 Analyzing {len(coordinates)} coordinates with real water data...")
 
-        suitable_areas = []
-        processed = 0
+        # Tam vektörel pandas hattı: thread başına Python çağrısı yok
+        suitable_df = analyze_coordinates_batch(coordinates, water_sources, max_areas)
+        processed = len(coordinates)
 
-        # Paralel analiz
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            coord_list = [(lat, lon, {}) for lat, lon in coordinates]
-            future_to_coord = {
-                executor.submit(analyze_coordinate_with_real_water, coord, water_sources): coord
-                for coord in coord_list
-            }
-
-            for future in as_completed(future_to_coord):
-                processed += 1
-                result = future.result()
+        # Metin alanları sadece gösterilen ilk 10 satır için formatlanır;
+        # elenen satırların string'leri hiç üretilmez
+        top_df = add_suitability_details(suitable_df.head(10))
 
-                if result and result['suitability_score'] >= 60:
-                    suitable_areas.append(result)
-                    if len(suitable_areas) >= max_areas:
-                        break
-
-                if processed % 50 == 0:
-                    print(f"📍 {processed}/{len(coordinates)} processed - {len(suitable_areas)} productive areas")
+        print(f"📍 {processed} processed - {len(suitable_df)} productive areas")
 
         processing_time = time.time() - start_time
 
-        # Format results
+        # Format results: formatlı kolonlar vektörel kurulur, satır döngüsü yok
         top_areas_formatted = []
-        for i, area in enumerate(suitable_areas[:10], 1):
-            top_areas_formatted.append({
-                "rank": i,
-                "coordinates": f"{area['latitude']:.4f}, {area['longitude']:.4f}",
-                "score": area['suitability_score'],
-                "category": area['suitability_category'],
-                "water": f"{area['water_distance_km']}km ({area['nearest_water_name']})",
-                "slope": f"{area['slope_percent']}%",
-                "elevation": f"{area['elevation_m']}m",
-                "soil": f"{area['soil_type']} (pH:{area['soil_ph']})",
-                "precipitation": f"{area['annual_precipitation_mm']}mm",
-                "sunshine": f"{area['sunshine_hours']} hours",
-                "details": area['detailed_reasons']
+        if len(top_df) > 0:
+            fmt = pd.DataFrame({
+                # rank/score object dtype kalır ki to_dict saf Python int döndürsün
+                "rank": pd.Series(list(range(1, len(top_df) + 1)),
+                                  index=top_df.index, dtype=object),
+                "coordinates": (top_df['latitude'].round(4).astype(str) + ', '
+                                + top_df['longitude'].round(4).astype(str)),
+                "score": pd.Series(top_df['suitability_score'].tolist(),
+                                   index=top_df.index, dtype=object),
+                "category": top_df['suitability_category'],
+                "water": (top_df['water_distance_km'].astype(str) + 'km ('
+                          + top_df['nearest_water_name'] + ')'),
+                "slope": top_df['slope_percent'].astype(str) + '%',
+                "elevation": top_df['elevation_m'].astype(str) + 'm',
+                "soil": (top_df['soil_type'] + ' (pH:'
+                         + top_df['soil_ph'].astype(str) + ')'),
+                "precipitation": top_df['annual_precipitation_mm'].astype(str) + 'mm',
+                "sunshine": top_df['sunshine_hours'].astype(str) + ' hours',
+                "details": top_df['detailed_reasons']
             })
+            top_areas_formatted = fmt.to_dict('records')
 
         analysis_data = {
             "summary": {
                 "total_analyzed": processed,
-                "productive_areas": len(suitable_areas),
-                "success_rate": round((len(suitable_areas) / processed * 100), 2) if processed > 0 else 0
+                "productive_areas": len(suitable_df),
+                "success_rate": round((len(suitable_df) / processed * 100), 2) if processed > 0 else 0
             },
             "top_areas": top_areas_formatted,
             "processing_time": round(processing_time, 2)
@@ -591,11 +1038,18 @@ async def health_check():
 @app.get("/api/water-sources")
 async def get_water_sources():
     """Su kaynaklarını getir"""
-    water_sources = get_all_water_sources_from_osm()
+    await asyncio.to_thread(_warmup_done.wait)
+    water_sources = get_water_sources_cached()
     return {
         "success": True,
-        "water_sources_count": len(water_sources),
-        "water_sources": water_sources[:100]  # İlk 100'ü göster
+        "water_sources_count": int(water_sources.lats.size),
+        "water_sources": [  # İlk 100'ü göster
+            {"lat": float(lat), "lon": float(lon), "name": name, "type": water_type}
+            for lat, lon, name, water_type in zip(
+                water_sources.lats[:100], water_sources.lons[:100],
+                water_sources.names[:100], water_sources.types[:100]
+            )
+        ]
     }
 
 